@@ -1,11 +1,20 @@
 """
 Bot initialization and setup
 """
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters
 from telegram import Update
-from config import TELEGRAM_BOT_TOKEN
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_BASE_URL, TELEGRAM_BASE_FILE_URL,
+    FLOOD_CONTROL_ENABLED, PROOF_VERIFICATION_ENABLED
+)
 from data_manager import DataManager
 from handlers import BotHandlers
+from flood_control import FloodController
+from dedup import UpdateDeduplicator
+from persistence import DataManagerPersistence
+from proof_verifier import ProofVerifier
+from fanout import FanoutSender
+from telegram_request import build_requests
 
 
 class SweatDupeBot:
@@ -13,7 +22,16 @@ class SweatDupeBot:
     
     def __init__(self):
         self.data_manager = DataManager()
-        self.handlers = BotHandlers(self.data_manager)
+        self.fanout = FanoutSender()  # Shared, so all crew messages are paced together
+        self.proof_verifier = None
+        if PROOF_VERIFICATION_ENABLED:
+            if ProofVerifier.is_available():
+                self.proof_verifier = ProofVerifier(self.data_manager, self.fanout)
+            else:
+                print("⚠️  Proof verification needs opencv-python-headless, skipping it")
+        self.handlers = BotHandlers(self.data_manager, self.proof_verifier, self.fanout)
+        self.flood_controller = FloodController()
+        self.deduplicator = UpdateDeduplicator(self.data_manager)
         self.application = None
     
     def setup(self):
@@ -25,13 +43,30 @@ class SweatDupeBot:
                 "2. Replace 'your_token_here' with your actual token from @BotFather"
             )
         
-        # Create application
-        self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+        # Create application (PTB data is stored alongside ours, one flush per interval)
+        request, updates_request = build_requests()
+        self.application = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .request(request)
+            .get_updates_request(updates_request)
+            .base_url(TELEGRAM_BASE_URL)
+            .base_file_url(TELEGRAM_BASE_FILE_URL)
+            .persistence(DataManagerPersistence(self.data_manager))
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
+        
+        # Drop redelivered updates, then floods, before any handler runs
+        self.application.add_handler(TypeHandler(Update, self.deduplicator.check_update), group=-2)
+        if FLOOD_CONTROL_ENABLED:
+            self.application.add_handler(TypeHandler(Update, self.flood_controller.check_update), group=-1)
         
         # Add handlers
         self.application.add_handler(CommandHandler("myid", self.handlers.myid))
         self.application.add_handler(CommandHandler("start", self.handlers.start))
         self.application.add_handler(CommandHandler("setgoal", self.handlers.setgoal))
+        self.application.add_handler(CommandHandler("setcrewgoal", self.handlers.setcrewgoal))
         self.application.add_handler(CommandHandler("setstakes", self.handlers.setstakes))
         self.application.add_handler(CommandHandler("progress", self.handlers.progress))
         self.application.add_handler(CommandHandler("test_reset", self.handlers.test_reset))
@@ -40,6 +75,11 @@ class SweatDupeBot:
         # Unknown command handler (must be last)
         self.application.add_handler(MessageHandler(filters.COMMAND, self.handlers.unknown_command))
     
+    async def _post_shutdown(self, application: Application):
+        """Stop background workers once the bot has stopped"""
+        if self.proof_verifier:
+            self.proof_verifier.shutdown()
+    
     def run(self):
         """Start the bot"""
         self.setup()
@@ -22,7 +22,66 @@ MAX_USERS = 2
 MIN_WEEKLY_GOAL = 1
 MAX_WEEKLY_GOAL = 7
 
+# Group mode
+# A crew of up to MAX_GROUP_SIZE members with a shared weekly target, instead of a 1-on-1 partnership
+GROUP_MODE = os.getenv("GROUP_MODE", "false").lower() == "true"
+MAX_GROUP_SIZE = 50
+if GROUP_MODE:
+    MAX_USERS = MAX_GROUP_SIZE
+
+# Crew notifications are sent in paced batches (Telegram allows ~30 messages/second)
+FANOUT_BATCH_SIZE = 10        # Members notified per batch (2 API calls each)
+FANOUT_BATCH_INTERVAL = 1.0   # Seconds between batches
+
 # Whitelist (Private Mode)
 # Set to empty list [] to allow anyone, or add Telegram usernames (without @)
 # Example: WHITELIST = ["CincoDeMayo13", "canliddatmeh"]
 WHITELIST = ["CincoDeMayo13", "canliddatmeh"]  # Add partner's username here (without @)
+
+# Flood control
+# Per-user token buckets, one per command class: (tokens refilled per second, burst size)
+FLOOD_CONTROL_ENABLED = os.getenv("FLOOD_CONTROL_ENABLED", "true").lower() == "true"
+FLOOD_LIMITS = {
+    "video_note": (1 / 60, 3),  # One workout proof a minute, bursts of 3
+    "command": (0.5, 5),        # One command every 2 seconds, bursts of 5
+    "other": (1.0, 10),         # Everything else
+}
+FLOOD_IDLE_EVICT_SECONDS = 15 * 60  # Forget buckets of users idle this long
+
+# Redelivered update detection
+DEDUP_CACHE_SIZE = 1024  # Recently seen update / message IDs kept in memory
+# Telegram picks a random update_id after a week without updates, so an older mark is ignored
+DEDUP_MARK_MAX_AGE_DAYS = 6
+
+# Persistence
+# Seconds between flushes of bot data to DATA_FILE (changes are batched in memory)
+PERSISTENCE_UPDATE_INTERVAL = int(os.getenv("PERSISTENCE_UPDATE_INTERVAL", "5"))
+
+# Stats API
+# Read-only copy of the stats, republished after every flush for the web server
+STATS_SNAPSHOT_FILE = "stats_snapshot.json"
+MAX_HISTORY_WEEKS = 52
+
+# Telegram Bot API endpoints (point these at a local Bot API server / stand-in for testing)
+TELEGRAM_BASE_URL = os.getenv("TELEGRAM_BASE_URL", "https://api.telegram.org/bot")
+TELEGRAM_BASE_FILE_URL = os.getenv("TELEGRAM_BASE_FILE_URL", "https://api.telegram.org/file/bot")
+
+# Proof verification
+# Perceptual hashing of video notes to catch recycled footage (needs opencv-python-headless)
+PROOF_VERIFICATION_ENABLED = os.getenv("PROOF_VERIFICATION_ENABLED", "false").lower() == "true"
+PROOF_HASH_WORKERS = 2        # Processes hashing videos off the event loop
+PROOF_FRAMES_PER_VIDEO = 8    # Frames sampled and hashed per video note
+PROOF_MATCH_DISTANCE = 10     # Max differing bits (of 64) for two frames to match
+PROOF_MATCH_MIN_FRAMES = 4    # Matching frames needed to flag a proof as recycled
+PROOF_HISTORY_LIMIT = 200     # Past proofs kept in the index
+
+# Outbound Telegram HTTP connections
+# Separate pools so get_updates long polling never waits behind send_message / forward calls
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "16"))  # Outbound API calls
+TELEGRAM_UPDATES_POOL_SIZE = 1                                    # get_updates (one at a time)
+TELEGRAM_KEEPALIVE_SECONDS = 30.0  # How long idle connections stay open for reuse
+TELEGRAM_CONNECT_TIMEOUT = 5.0
+TELEGRAM_READ_TIMEOUT = 10.0
+TELEGRAM_WRITE_TIMEOUT = 10.0
+TELEGRAM_POOL_TIMEOUT = 5.0        # Max wait for a free connection
+TELEGRAM_HTTP_VERSION = os.getenv("TELEGRAM_HTTP_VERSION", "1.1")  # "2" needs python-telegram-bot[http2]
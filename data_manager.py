@@ -6,7 +6,8 @@ import json
 import os
 from typing import Optional
 from datetime import datetime, timedelta
-from config import DATA_FILE
+from config import DATA_FILE, MAX_HISTORY_WEEKS, MAX_USERS
+from snapshot import write_snapshot
 
 
 class DataManager:
@@ -14,6 +15,9 @@ class DataManager:
     
     def __init__(self):
         self.data = self.load_data()
+        self._deferred = False  # When True, saves wait for flush()
+        self._dirty = False
+        write_snapshot(self.data)  # Give the stats API something to serve right away
     
     def load_data(self) -> dict:
         """Load data from JSON file"""
@@ -34,9 +38,28 @@ class DataManager:
         }
     
     def save_data(self):
-        """Save data to JSON file"""
-        with open(DATA_FILE, 'w') as f:
+        """Save data to JSON file (or mark it for the next flush if saves are deferred)"""
+        if self._deferred:
+            self._dirty = True
+            return
+        self.flush()
+    
+    def defer_saves(self):
+        """Batch saves into flush() calls instead of rewriting the file every change"""
+        self._deferred = True
+    
+    def is_dirty(self) -> bool:
+        """Check if there are changes waiting for flush()"""
+        return self._dirty
+    
+    def flush(self):
+        """Write data to the JSON file atomically"""
+        temp_file = f"{DATA_FILE}.tmp"
+        with open(temp_file, 'w') as f:
             json.dump(self.data, f, indent=2)
+        os.replace(temp_file, DATA_FILE)
+        self._dirty = False
+        write_snapshot(self.data)
     
     def get_partner_id(self, user_id: int) -> Optional[int]:
         """Get the partner's user_id"""
@@ -48,6 +71,10 @@ class DataManager:
                     return int(uid)
         return None
     
+    def get_member_ids(self, user_id: int) -> list:
+        """Get the user_ids of everyone else in the partnership or crew"""
+        return [int(uid) for uid in self.data.get("users", {}) if uid != str(user_id)]
+    
     def get_week_start(self) -> datetime:
         """Get the start of the current week (Monday)"""
         today = datetime.now()
@@ -73,6 +100,8 @@ class DataManager:
         # If current week is different, reset
         if current_week_start > stored_date:
             print(f"✅ New week detected: {stored_date.strftime('%Y-%m-%d')} → {current_week_start.strftime('%Y-%m-%d')}")
+            # Only real rollovers go into history, not forced /test_reset resets
+            self._record_week_history()
             self._reset_weekly_data()
             return True
         return False
@@ -91,6 +120,25 @@ class DataManager:
         self.save_data()
         print(f"   New week starts: {self.data['week_start']}\n")
     
+    def _record_week_history(self):
+        """Keep a summary of the finished week before counts are reset"""
+        if self.data.get("week_start") is None:
+            return
+        history = self.data.setdefault("history", [])
+        history.append({
+            "week_start": self.data["week_start"],
+            "stakes": self.data.get("stakes"),
+            "results": {
+                user_id: {
+                    "name": user["name"],
+                    "weekly_goal": user["weekly_goal"],
+                    "workouts": user["workouts_this_week"],
+                }
+                for user_id, user in self.data.get("users", {}).items()
+            },
+        })
+        del history[:-MAX_HISTORY_WEEKS]
+    
     def get_user_ids(self) -> list:
         """Get list of all user IDs"""
         return [int(uid) for uid in self.data.get("users", {}).keys()]
@@ -107,7 +155,7 @@ class DataManager:
     def add_user(self, user_id: int, username: str) -> bool:
         """Add a new user. Returns True if successful, False if full"""
         users = self.data.get("users", {})
-        if len(users) >= 2:
+        if len(users) >= MAX_USERS:
             return False
         
         users[str(user_id)] = {
@@ -148,10 +196,36 @@ class DataManager:
         self.data["stakes"] = stakes
         self.save_data()
     
+    def set_crew_goal(self, goal: int):
+        """Set the crew's shared weekly workout target (group mode)"""
+        self.data["crew_goal"] = goal
+        self.save_data()
+    
+    def get_crew_goal(self) -> int:
+        """Get the crew's shared weekly workout target (0 if not set)"""
+        return self.data.get("crew_goal", 0)
+    
+    def get_crew_total(self) -> int:
+        """Get the number of workouts logged by the whole crew this week"""
+        return sum(user["workouts_this_week"] for user in self.data.get("users", {}).values())
+    
     def get_stakes(self) -> str:
         """Get current stakes"""
         return self.data.get("stakes", "Not set")
     
+    def get_last_update(self) -> tuple:
+        """Get the highest handled Telegram update_id and when it was handled (or None)"""
+        handled_at = self.data.get("last_update_at")
+        return (
+            self.data.get("last_update_id", 0),
+            datetime.fromisoformat(handled_at) if handled_at else None
+        )
+    
+    def set_last_update(self, update_id: int, handled_at: datetime):
+        """Record the highest handled update_id (written with the next save)"""
+        self.data["last_update_id"] = update_id
+        self.data["last_update_at"] = handled_at.isoformat()
+    
     def get_user_count(self) -> int:
         """Get number of registered users"""
         return len(self.data.get("users", {}))
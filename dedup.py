@@ -0,0 +1,79 @@
+"""
+Redelivered update detection for Sweat Dupe bot
+Telegram resends updates after webhook failures or a crash before the polling
+offset is acknowledged. This drops them before any handler can double-count
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+import metrics
+from config import DEDUP_CACHE_SIZE, DEDUP_MARK_MAX_AGE_DAYS
+from data_manager import DataManager
+
+
+class UpdateDeduplicator:
+    """Bounded LRU of seen update / message IDs plus a persisted high-water mark.
+    The mark only catches redeliveries after a restart; while running, updates can
+    arrive out of order (webhooks with several connections), so the LRU decides"""
+
+    def __init__(self, data_manager: DataManager, max_size: int = DEDUP_CACHE_SIZE):
+        self.dm = data_manager
+        self.max_size = max_size
+        self._seen = OrderedDict()  # update_id or (chat_id, message_id): None
+        self._high_water, self._high_water_at = data_manager.get_last_update()
+        # The mark as of startup: everything at or below it was handled before the restart
+        self._restart_mark, self._restart_mark_at = self._high_water, self._high_water_at
+
+    def _remember(self, key):
+        """Add a key to the LRU, evicting the oldest once full"""
+        self._seen[key] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    @staticmethod
+    def _is_fresh(marked_at: Optional[datetime], now: datetime) -> bool:
+        """Check if a mark can still be trusted.
+        After a week without updates Telegram restarts update_ids at random"""
+        if marked_at is None:
+            return False
+        return now - marked_at < timedelta(days=DEDUP_MARK_MAX_AGE_DAYS)
+
+    def is_duplicate(self, update: Update, now: Optional[datetime] = None) -> bool:
+        """Check an update and remember it. Returns True if it was already seen"""
+        if now is None:
+            now = datetime.now()
+        update_id = update.update_id
+        # Only new messages: edits share their (chat_id, message_id) but are new updates
+        message = update.message or update.channel_post
+        message_key = (message.chat_id, message.message_id) if message else None
+
+        if update_id in self._seen:
+            return True
+        if update_id <= self._restart_mark and self._is_fresh(self._restart_mark_at, now):
+            return True
+        if message_key is not None and message_key in self._seen:
+            # Same message under a new update_id
+            self._seen.move_to_end(message_key)
+            return True
+
+        self._remember(update_id)
+        if message_key is not None:
+            self._remember(message_key)
+
+        # Persisted together with whatever the handlers save for this update,
+        # so after a crash the mark and the workout count agree
+        if update_id > self._high_water or not self._is_fresh(self._high_water_at, now):
+            self._high_water = update_id
+        self._high_water_at = now
+        self.dm.set_last_update(self._high_water, now)
+        return False
+
+    async def check_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Stop handling an update that has already been handled"""
+        if self.is_duplicate(update):
+            metrics.increment("dedup.dropped")
+            print(f"♻️ Skipping redelivered update {update.update_id}")
+            raise ApplicationHandlerStop
+        metrics.increment("dedup.passed")
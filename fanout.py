@@ -0,0 +1,50 @@
+"""
+Crew notifications for Sweat Dupe bot
+Delivers a workout to every crew member in paced batches so a big crew
+doesn't blow through Telegram's rate limits
+"""
+import asyncio
+from typing import Optional
+from telegram import Bot, Message
+import metrics
+from config import FANOUT_BATCH_SIZE, FANOUT_BATCH_INTERVAL
+
+
+class FanoutSender:
+    """Sends one message (and optionally a forward) to many chats in rate-limited batches"""
+
+    def __init__(self, batch_size: int = FANOUT_BATCH_SIZE, interval: float = FANOUT_BATCH_INTERVAL):
+        self.batch_size = batch_size
+        self.interval = interval
+        # One fan-out at a time, so batches from back-to-back workouts don't stack up
+        self._lock = asyncio.Lock()
+
+    async def _deliver(self, bot: Bot, chat_id: int, text: str, forward: Optional[Message]):
+        await bot.send_message(chat_id=chat_id, text=text)
+        if forward is not None:
+            await bot.forward_message(
+                chat_id=chat_id, from_chat_id=forward.chat_id, message_id=forward.message_id
+            )
+
+    async def send(self, bot: Bot, chat_ids: list, text: str, forward: Optional[Message] = None):
+        """Send text (and forward a message) to every chat in chat_ids"""
+        await self.send_each(bot, {chat_id: text for chat_id in chat_ids}, forward)
+
+    async def send_each(self, bot: Bot, texts: dict, forward: Optional[Message] = None):
+        """Send each chat its own text (chat_id: text), and forward a message to all of them"""
+        chat_ids = list(texts)
+        async with self._lock:
+            for start in range(0, len(chat_ids), self.batch_size):
+                if start:
+                    await asyncio.sleep(self.interval)
+                batch = chat_ids[start:start + self.batch_size]
+                results = await asyncio.gather(
+                    *(self._deliver(bot, chat_id, texts[chat_id], forward) for chat_id in batch),
+                    return_exceptions=True,
+                )
+                for chat_id, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        metrics.increment("fanout.failed")
+                        print(f"❌ Could not notify crew member {chat_id}: {result}")
+                    else:
+                        metrics.increment("fanout.delivered")
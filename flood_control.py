@@ -0,0 +1,88 @@
+"""
+Flood control for Sweat Dupe bot
+Drops updates from users who exceed their per-command-class rate limit
+before any handler (and its disk write / Telegram calls) runs
+"""
+import time
+from typing import Optional
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+import metrics
+from config import FLOOD_LIMITS, FLOOD_IDLE_EVICT_SECONDS
+
+
+class FloodController:
+    """Per-user token buckets, checked ahead of all other handlers"""
+
+    def __init__(self, limits: Optional[dict] = None, idle_seconds: float = FLOOD_IDLE_EVICT_SECONDS):
+        self.limits = limits or FLOOD_LIMITS
+        if "other" not in self.limits:
+            # Unknown command classes fall back to the "other" limit
+            raise ValueError('Flood limits need an "other" entry')
+        self.idle_seconds = idle_seconds
+        # (user_id, command_class): [tokens, last_refill, throttled]
+        self._buckets = {}
+        self._last_sweep = time.monotonic()
+
+    @staticmethod
+    def classify(update: Update) -> str:
+        """Get the command class an update is rate limited under"""
+        message = update.effective_message
+        if message is None:
+            return "other"
+        if message.video_note:
+            return "video_note"
+        if message.text and message.text.startswith("/"):
+            return "command"
+        return "other"
+
+    def allow(self, user_id: int, command_class: str, now: Optional[float] = None) -> bool:
+        """Take a token from the user's bucket. Returns False if it is empty"""
+        if now is None:
+            now = time.monotonic()
+        if now - self._last_sweep >= self.idle_seconds:
+            self._evict_idle(now)
+
+        rate, burst = self.limits.get(command_class, self.limits["other"])
+        key = (user_id, command_class)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # New buckets start full, minus the token being spent now
+            self._buckets[key] = [burst - 1.0, now, False]
+            return True
+
+        bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            bucket[2] = False
+            return True
+        return False
+
+    def _evict_idle(self, now: float):
+        """Drop buckets that have been idle long enough to be full again anyway"""
+        cutoff = now - self.idle_seconds
+        idle = [key for key, bucket in self._buckets.items() if bucket[1] < cutoff]
+        for key in idle:
+            del self._buckets[key]
+        self._last_sweep = now
+        metrics.set_gauge("flood.buckets", len(self._buckets))
+
+    async def check_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Stop handling an update if its sender is flooding"""
+        user = update.effective_user
+        if user is None:
+            return
+
+        command_class = self.classify(update)
+        if self.allow(user.id, command_class):
+            metrics.increment(f"flood.allowed.{command_class}")
+            return
+
+        metrics.increment(f"flood.dropped.{command_class}")
+        bucket = self._buckets[(user.id, command_class)]
+        if not bucket[2]:
+            # Only log the first drop of each flood
+            bucket[2] = True
+            print(f"🚧 Flood control: dropping {command_class} updates from user {user.id}")
+        raise ApplicationHandlerStop
@@ -3,17 +3,32 @@ Telegram bot handlers for Sweat Dupe
 Contains all command and message handlers
 """
 from datetime import timedelta
+from typing import Optional
 from telegram import Update
 from telegram.ext import ContextTypes
 from data_manager import DataManager
-from config import MAX_USERS, MIN_WEEKLY_GOAL, MAX_WEEKLY_GOAL, WHITELIST
+from proof_verifier import ProofVerifier
+from fanout import FanoutSender
+from progress_board import ProgressBoard
+from config import MAX_USERS, MIN_WEEKLY_GOAL, MAX_WEEKLY_GOAL, WHITELIST, GROUP_MODE
 
 
 class BotHandlers:
     """Collection of all bot command and message handlers"""
     
-    def __init__(self, data_manager: DataManager):
+    def __init__(self, data_manager: DataManager, proof_verifier: Optional[ProofVerifier] = None,
+                 fanout: Optional[FanoutSender] = None):
         self.dm = data_manager
+        self.proof_verifier = proof_verifier
+        self.board = ProgressBoard(data_manager)
+        self.fanout = fanout or FanoutSender()
+    
+    def _check_week(self) -> bool:
+        """Reset for a new week if needed, keeping the progress board in sync"""
+        was_reset = self.dm.check_and_reset_week()
+        if was_reset:
+            self.board.invalidate()
+        return was_reset
     
     def _is_whitelisted(self, user_id: int) -> bool:
         """Check if user is whitelisted (if whitelist is enabled)"""
@@ -43,35 +58,43 @@ class BotHandlers:
         
         user_ids = self.dm.get_user_ids()
         week_start = self.dm.get_week_start()
+        messages = {}
         
         for user_id in user_ids:
-            try:
-                user_data = self.dm.get_user_data(user_id)
-                current_goal = user_data.get("weekly_goal", 0) if user_data else 0
-                
-                message = (
-                    f"🗓️ NEW WEEK STARTED! 🗓️\n\n"
-                    f"Week of {week_start.strftime('%B %d, %Y')}\n\n"
-                    f"Your workouts have been reset to 0.\n"
+            user_data = self.dm.get_user_data(user_id)
+            current_goal = user_data.get("weekly_goal", 0) if user_data else 0
+            
+            message = (
+                f"🗓️ NEW WEEK STARTED! 🗓️\n\n"
+                f"Week of {week_start.strftime('%B %d, %Y')}\n\n"
+                f"Your workouts have been reset to 0.\n"
+            )
+            
+            if current_goal > 0:
+                message += (
+                    f"\n💪 Your goal: {current_goal} workouts\n\n"
+                    f"Want to change it? Use /setgoal\n"
+                    f"Time to crush it! 🔥"
                 )
-                
-                if current_goal > 0:
-                    message += (
-                        f"\n💪 Your goal: {current_goal} workouts\n\n"
-                        f"Want to change it? Use /setgoal\n"
-                        f"Time to crush it! 🔥"
-                    )
-                else:
-                    message += (
-                        f"\n⚠️ You haven't set a goal yet!\n\n"
-                        f"Use /setgoal [number] to set your weekly target\n"
-                        f"Example: /setgoal 4"
-                    )
-                
-                await context.bot.send_message(chat_id=user_id, text=message)
-                print(f"✅ Sent new week notification to user {user_id}")
-            except Exception as e:
-                print(f"❌ Failed to send notification to user {user_id}: {e}")
+            else:
+                message += (
+                    f"\n⚠️ You haven't set a goal yet!\n\n"
+                    f"Use /setgoal [number] to set your weekly target\n"
+                    f"Example: /setgoal 4"
+                )
+            messages[user_id] = message
+        
+        if GROUP_MODE:
+            # Paced batches in the background, so /start doesn't wait on the whole crew
+            context.application.create_task(self.fanout.send_each(context.bot, messages))
+            print(f"✅ Queued new week notification for {len(messages)} crew members")
+        else:
+            for user_id, message in messages.items():
+                try:
+                    await context.bot.send_message(chat_id=user_id, text=message)
+                    print(f"✅ Sent new week notification to user {user_id}")
+                except Exception as e:
+                    print(f"❌ Failed to send notification to user {user_id}: {e}")
         
         self.dm.mark_week_notification_sent()
     
@@ -121,7 +144,7 @@ class BotHandlers:
             print(f"⚠️ Unauthorized access attempt by {username} (@{tg_username}, ID: {user_id})")
             return
         
-        was_reset = self.dm.check_and_reset_week()
+        was_reset = self._check_week()
         
         # Send week notification if needed
         if was_reset or self.dm.should_send_week_notification():
@@ -136,8 +159,19 @@ class BotHandlers:
             )
         elif self.dm.get_user_count() < MAX_USERS:
             self.dm.add_user(user_id, username)
+            self.board.invalidate()
             
-            if self.dm.get_user_count() == 1:
+            if GROUP_MODE:
+                await update.message.reply_text(
+                    f"🔥 Welcome to the crew, {username}! "
+                    f"({self.dm.get_user_count()}/{MAX_USERS} members)\n\n"
+                    f"1️⃣ Set your weekly goal: /setgoal 4\n"
+                    f"2️⃣ Set the crew's target: /setcrewgoal 20\n"
+                    f"3️⃣ After each workout, send a video bubble (Sweatcam)!\n"
+                    f"4️⃣ Check the board with /progress\n\n"
+                    f"Let's get it! 💪"
+                )
+            elif self.dm.get_user_count() == 1:
                 await update.message.reply_text(
                     f"🔥 Hey {username}! You're in!\n"
                     f"Waiting for your workout partner to join...\n\n"
@@ -153,6 +187,10 @@ class BotHandlers:
                     f"4️⃣ End of week: Did you both hit your goals? 👀\n\n"
                     f"Let's get it! 💪"
                 )
+        elif GROUP_MODE:
+            await update.message.reply_text(
+                f"Sorry {username}, the crew is full ({MAX_USERS} members)! 🤝"
+            )
         else:
             await update.message.reply_text(
                 f"Sorry {username}, this bot is for a 1-on-1 partnership and it's already full! 🤝"
@@ -165,7 +203,7 @@ class BotHandlers:
         if not self._check_username_whitelist(update):
             return
         
-        self.dm.check_and_reset_week()
+        self._check_week()
         
         username = update.effective_user.first_name or "Champion"
         
@@ -192,6 +230,7 @@ class BotHandlers:
             return
         
         self.dm.update_user_goal(user_id, goal)
+        self.board.invalidate()
         user_data = self.dm.get_user_data(user_id)
         
         await update.message.reply_text(
@@ -200,7 +239,15 @@ class BotHandlers:
             f"Send a video bubble after each workout to log it! 💪"
         )
         
-        # Notify partner
+        # Notify crew / partner
+        if GROUP_MODE:
+            context.application.create_task(self.fanout.send(
+                context.bot, self.dm.get_member_ids(user_id),
+                f"🔔 {username} set their goal: {goal} workouts!\n\n"
+                f"Time to step up! 🔥"
+            ))
+            return
+        
         partner_id = self.dm.get_partner_id(user_id)
         if partner_id:
             try:
@@ -215,6 +262,54 @@ class BotHandlers:
             except Exception as e:
                 print(f"Could not notify partner: {e}")
     
+    async def setcrewgoal(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /setcrewgoal command - set the crew's shared weekly target (group mode)"""
+        user_id = update.effective_user.id
+        
+        if not self._check_username_whitelist(update):
+            return
+        
+        if not GROUP_MODE:
+            await update.message.reply_text("⚠️ Crew goals are only available in group mode!")
+            return
+        
+        self._check_week()
+        
+        if not self.dm.user_exists(user_id):
+            await update.message.reply_text("⚠️ You need to /start first!")
+            return
+        
+        max_goal = MAX_WEEKLY_GOAL * self.dm.get_user_count()
+        if not context.args or not context.args[0].isdigit():
+            await update.message.reply_text(
+                "💡 Set the crew's weekly workout target like this:\n"
+                "/setcrewgoal 20  (20 workouts between all of you this week)"
+            )
+            return
+        
+        goal = int(context.args[0])
+        
+        if goal < MIN_WEEKLY_GOAL or goal > max_goal:
+            await update.message.reply_text(
+                f"⚠️ Crew goal must be between {MIN_WEEKLY_GOAL} and {max_goal} workouts per week!"
+            )
+            return
+        
+        self.dm.set_crew_goal(goal)
+        self.board.invalidate()
+        username = update.effective_user.first_name or "Champion"
+        
+        await update.message.reply_text(
+            f"👥 CREW GOAL SET: {goal} workouts this week!\n\n"
+            f"Current progress: {self.dm.get_crew_total()}/{goal}"
+        )
+        
+        context.application.create_task(self.fanout.send(
+            context.bot, self.dm.get_member_ids(user_id),
+            f"👥 {username} set the crew goal: {goal} workouts this week!\n\n"
+            f"Let's get it! 🔥"
+        ))
+    
     async def setstakes(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /setstakes command - set what happens if someone fails"""
         user_id = update.effective_user.id
@@ -247,6 +342,7 @@ class BotHandlers:
         
         stakes = " ".join(context.args)
         self.dm.set_stakes(stakes)
+        self.board.invalidate()
         
         await update.message.reply_text(
             f"💰 STAKES SET!\n\n"
@@ -256,7 +352,16 @@ class BotHandlers:
             f"Let the games begin! 🔥"
         )
         
-        # Notify partner (if exists)
+        # Notify crew / partner (if exists)
+        if GROUP_MODE:
+            context.application.create_task(self.fanout.send(
+                context.bot, self.dm.get_member_ids(user_id),
+                f"💰 Stakes have been set:\n\n"
+                f"📜 {stakes}\n\n"
+                f"Game on! 🔥"
+            ))
+            return
+        
         partner_id = self.dm.get_partner_id(user_id)
         if partner_id:
             try:
@@ -278,7 +383,7 @@ class BotHandlers:
         if not self._check_username_whitelist(update):
             return
         
-        self.dm.check_and_reset_week()
+        self._check_week()
         
         username = update.effective_user.first_name or "Your Partner"
         
@@ -308,6 +413,7 @@ class BotHandlers:
         
         # Log the workout
         self.dm.increment_workout_count(user_id)
+        self.board.record_workout(user_id)
         user_data = self.dm.get_user_data(user_id)
         
         workouts_done = user_data["workouts_this_week"]
@@ -316,8 +422,20 @@ class BotHandlers:
         # Check if goal reached
         goal_reached = workouts_done >= goal
         
-        # Forward the video note to partner (if exists)
-        if partner_id:
+        member_ids = self.dm.get_member_ids(user_id)
+        
+        # Fan out to the crew in the background, or forward to partner (if exists)
+        if GROUP_MODE:
+            crew_goal = self.dm.get_crew_goal()
+            context.application.create_task(self.fanout.send(
+                context.bot, member_ids,
+                f"📸 SWEATCAM from {username}!\n\n"
+                f"💪 Their progress: {workouts_done}/{goal} workouts\n"
+                f"👥 Crew: {self.dm.get_crew_total()}/{crew_goal if crew_goal > 0 else '?'} workouts\n\n"
+                f"Check out their proof! 👀",
+                forward=update.message
+            ))
+        elif partner_id:
             try:
                 partner_data = self.dm.get_user_data(partner_id)
                 partner_name = partner_data["name"] if partner_data else "Partner"
@@ -345,13 +463,26 @@ class BotHandlers:
         elif goal_reached:
             congrats = f"\n\n🔥 CRUSHING IT! That's {workouts_done} workouts!"
         
-        partner_msg = "Partner notified! 🔔" if partner_id else "[TEST MODE - No partner]"
+        if GROUP_MODE:
+            partner_msg = f"Crew notified! 🔔 ({len(member_ids)} members)"
+        else:
+            partner_msg = "Partner notified! 🔔" if partner_id else "[TEST MODE - No partner]"
         
         await update.message.reply_text(
             f"✅ WORKOUT LOGGED! 💪\n\n"
             f"This week: {workouts_done}/{goal} workouts\n"
             f"{partner_msg}{congrats}"
         )
+        
+        # Check for recycled footage in the background, after confirming
+        if self.proof_verifier:
+            video_note = update.message.video_note
+            context.application.create_task(
+                self.proof_verifier.verify(
+                    context.bot, user_id, username, video_note.file_id,
+                    video_note.file_unique_id, member_ids
+                )
+            )
     
     async def progress(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show current week's progress"""
@@ -360,12 +491,21 @@ class BotHandlers:
         if not self._check_username_whitelist(update):
             return
         
-        self.dm.check_and_reset_week()
+        self._check_week()
         
         if not self.dm.user_exists(user_id):
             await update.message.reply_text("You need to /start first!")
             return
         
+        if GROUP_MODE:
+            user_data = self.dm.get_user_data(user_id)
+            user_goal = user_data["weekly_goal"]
+            await update.message.reply_text(
+                f"YOU: 💪 {user_data['workouts_this_week']}/{user_goal if user_goal > 0 else '?'} workouts\n\n"
+                f"{self.board.render()}"
+            )
+            return
+        
         partner_id = self.dm.get_partner_id(user_id)
         
         # Get week info
@@ -453,6 +593,7 @@ class BotHandlers:
             
             # Manually trigger reset
             self.dm._reset_weekly_data()
+            self.board.invalidate()
             
             user_data = self.dm.get_user_data(update.effective_user.id)
             new_count = user_data["workouts_this_week"]
@@ -480,6 +621,7 @@ class BotHandlers:
             "/start - Register and join\n"
             "/setgoal [number] - Set weekly workout goal\n"
             "  Example: /setgoal 4\n\n"
+            "/setcrewgoal [number] - Set the crew's weekly target (group mode)\n\n"
             "/setstakes [text] - Set what's at stake\n"
             "  Example: /setstakes loser buys dinner\n\n"
             "/progress - Check this week's progress\n\n"
@@ -0,0 +1,85 @@
+"""
+Load test for Sweat Dupe bot's outbound Telegram traffic
+Fires concurrent send_message calls through the configured connection pool at
+a local fake Bot API server and prints the pool metrics
+
+Usage: python load_test.py [--messages 500] [--concurrency 50] [--latency-ms 50]
+Tune with the same environment variables as the bot (TELEGRAM_POOL_SIZE, ...)
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telegram import Bot
+import metrics
+from telegram_request import build_requests
+
+
+class FakeBotAPIHandler(BaseHTTPRequestHandler):
+    """Answers every Bot API method with a minimal successful result"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    latency = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+
+        method = self.path.rsplit("/", 1)[-1]
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Sweat Dupe", "username": "sweatdupe_bot"}
+        else:
+            result = {"message_id": 1, "date": int(time.time()), "chat": {"id": 1, "type": "private"}}
+
+        body = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the output readable
+
+
+async def run_load(port: int, messages: int, concurrency: int):
+    """Send messages through the bot's outbound pool and report timings"""
+    request, _ = build_requests()
+    bot = Bot("123:load-test", base_url=f"http://127.0.0.1:{port}/bot", request=request)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        async with semaphore:
+            await bot.send_message(chat_id=1, text=f"Load test message {i}")
+
+    async with bot:
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(messages)))
+        elapsed = time.perf_counter() - started
+
+    print(f"📨 Sent {messages} messages in {elapsed:.2f}s ({messages / elapsed:.0f}/s)")
+    print(json.dumps(metrics.snapshot(), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test outbound Telegram calls")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake API response time")
+    args = parser.parse_args()
+
+    FakeBotAPIHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBotAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🧪 Fake Bot API server on port {server.server_port}")
+
+    try:
+        asyncio.run(run_load(server.server_port, args.messages, args.concurrency))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
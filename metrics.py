@@ -0,0 +1,49 @@
+"""
+In-process metrics for Sweat Dupe bot
+Counters, gauges and timing observations shared by the bot and web server threads
+"""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+_observations = {}  # name: [count, total, max]
+
+
+def increment(name: str, value: int = 1):
+    """Increase a counter"""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float):
+    """Record the current value of something"""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value: float):
+    """Record one sample of a measurement (e.g. a duration in ms)"""
+    with _lock:
+        stats = _observations.get(name)
+        if stats is None:
+            _observations[name] = [1, value, value]
+        else:
+            stats[0] += 1
+            stats[1] += value
+            if value > stats[2]:
+                stats[2] = value
+
+
+def snapshot() -> dict:
+    """Get a copy of all metrics"""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "observations": {
+                name: {"count": count, "avg": total / count, "max": peak}
+                for name, (count, total, peak) in _observations.items()
+            },
+        }
@@ -0,0 +1,144 @@
+"""
+python-telegram-bot persistence for Sweat Dupe bot
+Stores PTB's bot/chat/user data and conversation states in the same file as
+DataManager, and flushes both in a single write per update_interval
+"""
+import asyncio
+import json
+from copy import deepcopy
+from typing import Optional
+from telegram.ext import BasePersistence, PersistenceInput
+import metrics
+from config import PERSISTENCE_UPDATE_INTERVAL
+from data_manager import DataManager
+
+
+class DataManagerPersistence(BasePersistence):
+    """BasePersistence that keeps its data under the "ptb" key of DataManager's data"""
+
+    def __init__(self, data_manager: DataManager, update_interval: float = PERSISTENCE_UPDATE_INTERVAL):
+        super().__init__(store_data=PersistenceInput(), update_interval=update_interval)
+        self.dm = data_manager
+        self.dm.defer_saves()
+        self._flush_scheduled = False
+
+    def _ptb_data(self) -> dict:
+        """Get PTB's section of the data file, creating it if needed"""
+        return self.dm.data.setdefault("ptb", {
+            "bot_data": {},
+            "chat_data": {},
+            "user_data": {},
+            "callback_data": None,
+            "conversations": {},
+        })
+
+    def _mark_changed(self, changed: bool = True):
+        """Flush once the current update_persistence run is done, if anything changed"""
+        if changed:
+            self.dm.save_data()
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        # update_persistence gathers all update_* calls at once, so a callback
+        # queued now runs after every one of them has finished
+        asyncio.get_running_loop().call_soon(self._flush_now)
+
+    @staticmethod
+    def _is_json(data, what: str) -> bool:
+        """Check a value can be written to the data file. Anything else is rejected here,
+        so it can never block DataManager's own saves"""
+        try:
+            json.dumps(data)
+        except (TypeError, ValueError) as e:
+            metrics.increment("persistence.rejected")
+            print(f"❌ Not persisting {what}, it isn't JSON serializable: {e}")
+            return False
+        return True
+
+    def _store(self, section: dict, key: str, data):
+        """Store a value, only marking the file dirty if it actually changed"""
+        if not self._is_json(data, key):
+            return
+        changed = section.get(key) != data
+        section[key] = data
+        self._mark_changed(changed)
+
+    def _flush_now(self):
+        self._flush_scheduled = False
+        self._flush_if_dirty()
+
+    def _flush_if_dirty(self):
+        """Write pending changes, reporting (not raising) failures so the next cycle retries"""
+        if not self.dm.is_dirty():
+            return
+        try:
+            self.dm.flush()
+        except (OSError, TypeError, ValueError) as e:
+            metrics.increment("persistence.flush_errors")
+            print(f"❌ Could not save bot data: {e}")
+
+    async def get_user_data(self) -> dict:
+        return {int(uid): deepcopy(data) for uid, data in self._ptb_data()["user_data"].items()}
+
+    async def get_chat_data(self) -> dict:
+        return {int(cid): deepcopy(data) for cid, data in self._ptb_data()["chat_data"].items()}
+
+    async def get_bot_data(self) -> dict:
+        return deepcopy(self._ptb_data()["bot_data"])
+
+    async def get_callback_data(self) -> Optional[tuple]:
+        data = self._ptb_data()["callback_data"]
+        if data is None:
+            return None
+        return [tuple(entry) for entry in data[0]], data[1]
+
+    async def get_conversations(self, name: str) -> dict:
+        # JSON has no tuple keys, so conversations are stored as [key, state] pairs
+        pairs = self._ptb_data()["conversations"].get(name, [])
+        return {tuple(key): state for key, state in pairs}
+
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]):
+        if not self._is_json(new_state, f"conversation {name}"):
+            return
+        pairs = self._ptb_data()["conversations"].setdefault(name, [])
+        pairs[:] = [pair for pair in pairs if tuple(pair[0]) != key]
+        if new_state is not None:
+            pairs.append([list(key), new_state])
+        self._mark_changed()
+
+    async def update_user_data(self, user_id: int, data: dict):
+        self._store(self._ptb_data()["user_data"], str(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: dict):
+        self._store(self._ptb_data()["chat_data"], str(chat_id), data)
+
+    async def update_bot_data(self, data: dict):
+        # Called every update_interval, which also flushes DataManager's own saves
+        self._store(self._ptb_data(), "bot_data", data)
+
+    async def update_callback_data(self, data: tuple):
+        if not self._is_json(data, "callback_data"):
+            return
+        self._ptb_data()["callback_data"] = [list(data[0]), data[1]]
+        self._mark_changed()
+
+    async def drop_chat_data(self, chat_id: int):
+        self._ptb_data()["chat_data"].pop(str(chat_id), None)
+        self._mark_changed()
+
+    async def drop_user_data(self, user_id: int):
+        self._ptb_data()["user_data"].pop(str(user_id), None)
+        self._mark_changed()
+
+    async def refresh_user_data(self, user_id: int, user_data: dict):
+        """Data only changes through this process, nothing to refresh"""
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict):
+        """Data only changes through this process, nothing to refresh"""
+
+    async def refresh_bot_data(self, bot_data: dict):
+        """Data only changes through this process, nothing to refresh"""
+
+    async def flush(self):
+        """Write any pending changes (called on shutdown)"""
+        self._flush_if_dirty()
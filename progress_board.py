@@ -0,0 +1,69 @@
+"""
+Crew progress board for Sweat Dupe bot
+Keeps /progress for a crew pre-rendered and patches one member's line per
+workout, instead of re-rendering every member on every request
+"""
+from datetime import timedelta
+from data_manager import DataManager
+
+
+class ProgressBoard:
+    """Cached, incrementally updated crew progress text"""
+
+    def __init__(self, data_manager: DataManager):
+        self.dm = data_manager
+        self._lines = None  # user_id: rendered line, in join order
+        self._total = 0
+        self._text = None
+
+    @staticmethod
+    def _render_line(user: dict) -> str:
+        done = user["workouts_this_week"]
+        goal = user["weekly_goal"]
+        status = "✅" if goal > 0 and done >= goal else "⏳"
+        return f"{status} {user['name']}: {done}/{goal if goal > 0 else '?'}"
+
+    def invalidate(self):
+        """Rebuild on next render (members, goals, stakes or week changed)"""
+        self._lines = None
+        self._text = None
+
+    def record_workout(self, user_id: int):
+        """Patch the board after a member logs a workout"""
+        if self._lines is None:
+            return
+        user = self.dm.get_user_data(user_id)
+        self._lines[str(user_id)] = self._render_line(user)
+        self._total += 1
+        self._text = None
+
+    def _rebuild(self):
+        users = self.dm.data.get("users", {})
+        self._lines = {uid: self._render_line(user) for uid, user in users.items()}
+        self._total = self.dm.get_crew_total()
+
+    def render(self) -> str:
+        """Get the board text"""
+        if self._text is not None:
+            return self._text
+        if self._lines is None:
+            self._rebuild()
+
+        week_start = self.dm.get_week_start()
+        week_end = week_start + timedelta(days=6)
+        crew_goal = self.dm.get_crew_goal()
+        crew_status = "🎉 Crew goal reached!" if crew_goal > 0 and self._total >= crew_goal else "⏳ Keep going!"
+
+        self._text = (
+            f"📊 CREW PROGRESS\n"
+            f"📅 {week_start.strftime('%b %d')} - {week_end.strftime('%b %d')}\n\n"
+            f"👥 CREW: {self._total}/{crew_goal if crew_goal > 0 else '?'} workouts\n"
+            f"{crew_status}\n\n"
+            + "\n".join(self._lines.values())
+            + f"\n\n💰 Stakes: {self.dm.get_stakes()}\n\n"
+            f"Commands:\n"
+            f"/setgoal [number] - Set your weekly goal\n"
+            f"/setcrewgoal [number] - Set the crew's weekly target\n"
+            f"Send bubble video - Log workout!"
+        )
+        return self._text
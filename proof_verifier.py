@@ -0,0 +1,198 @@
+"""
+Workout proof verification for Sweat Dupe bot
+Hashes frames of each video note in worker processes and compares them with
+past proofs of the partnership to catch re-recorded or resent footage
+"""
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+from telegram import Bot
+import metrics
+from config import (
+    PROOF_HASH_WORKERS, PROOF_FRAMES_PER_VIDEO, PROOF_MATCH_DISTANCE,
+    PROOF_MATCH_MIN_FRAMES, PROOF_HISTORY_LIMIT
+)
+from data_manager import DataManager
+from fanout import FanoutSender
+
+
+def compute_frame_hashes(path: str, frame_count: int = PROOF_FRAMES_PER_VIDEO) -> list:
+    """Get 64-bit difference hashes of frames sampled evenly through a video.
+    Runs in a worker process"""
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    try:
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total <= 0:
+            return []
+        positions = sorted({int(total * (i + 0.5) / frame_count) for i in range(frame_count)})
+
+        hashes = []
+        for position in positions:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, position)
+            ok, frame = capture.read()
+            if not ok:
+                continue
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+            # One bit per pixel: is it brighter than its right-hand neighbour?
+            value = 0
+            for row in small:
+                for x in range(8):
+                    value = (value << 1) | int(row[x] > row[x + 1])
+            hashes.append(value)
+        return hashes
+    finally:
+        capture.release()
+
+
+class HashIndex:
+    """BK-tree over 64-bit hashes for nearest-neighbour lookups by Hamming distance"""
+
+    def __init__(self):
+        self._root = None  # [hash, proof_id, {distance: child}]
+
+    def add(self, value: int, proof_id: int):
+        """Add a frame hash belonging to a proof"""
+        if self._root is None:
+            self._root = [value, proof_id, {}]
+            return
+        node = self._root
+        while True:
+            distance = (value ^ node[0]).bit_count()
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, proof_id, {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> set:
+        """Get IDs of proofs with a frame hash within max_distance bits"""
+        found = set()
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            distance = (value ^ node[0]).bit_count()
+            if distance <= max_distance:
+                found.add(node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+
+class ProofVerifier:
+    """Checks video notes against past proofs without holding up the event loop.
+    Each data file holds one partnership, so its proofs make up one index"""
+
+    def __init__(self, data_manager: DataManager, fanout: Optional[FanoutSender] = None):
+        self.dm = data_manager
+        self.fanout = fanout or FanoutSender()
+        self._executor = None
+        self._index = HashIndex()
+        self._next_id = 0
+        for proof in self._proofs():
+            self._index_proof(proof)
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check if the optional video decoding dependency is installed"""
+        return importlib.util.find_spec("cv2") is not None
+
+    def _proofs(self) -> list:
+        return self.dm.data.setdefault("proof_hashes", [])
+
+    def _index_proof(self, proof: dict):
+        for value in proof["hashes"]:
+            self._index.add(value, proof["id"])
+        self._next_id = max(self._next_id, proof["id"] + 1)
+
+    def _find_match(self, file_unique_id: str, hashes: list) -> Optional[dict]:
+        """Get the past proof this one looks like a copy of, if any"""
+        proofs = {proof["id"]: proof for proof in self._proofs()}
+        for proof in proofs.values():
+            if proof["file_unique_id"] == file_unique_id:
+                return proof
+
+        votes = {}
+        for value in hashes:
+            for proof_id in self._index.search(value, PROOF_MATCH_DISTANCE):
+                votes[proof_id] = votes.get(proof_id, 0) + 1
+        best = max(votes, key=votes.get, default=None)
+        if best is not None and votes[best] >= PROOF_MATCH_MIN_FRAMES and best in proofs:
+            return proofs[best]
+        return None
+
+    def _remember(self, user_id: int, file_unique_id: str, hashes: list):
+        """Add a proof to the index, dropping the oldest ones past the limit"""
+        proof = {
+            "id": self._next_id,
+            "user_id": user_id,
+            "file_unique_id": file_unique_id,
+            "date": datetime.now().isoformat(),
+            "hashes": hashes,
+        }
+        proofs = self._proofs()
+        proofs.append(proof)
+        self._index_proof(proof)
+        if len(proofs) > PROOF_HISTORY_LIMIT:
+            # Drop the oldest 10% at once, so the index is rebuilt only every
+            # PROOF_HISTORY_LIMIT // 10 proofs rather than on each one
+            del proofs[:len(proofs) - PROOF_HISTORY_LIMIT + max(1, PROOF_HISTORY_LIMIT // 10)]
+            self._index = HashIndex()
+            for kept in proofs:
+                self._index_proof(kept)
+        self.dm.save_data()
+
+    async def _hash_video(self, bot: Bot, file_id: str) -> list:
+        """Download a video note and hash its frames in a worker process"""
+        if self._executor is None:
+            # Forking a process that already runs Flask and bot threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=PROOF_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        telegram_file = await bot.get_file(file_id)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "proof.mp4")
+            await telegram_file.download_to_drive(path)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, compute_frame_hashes, path)
+
+    async def verify(self, bot: Bot, user_id: int, name: str, file_id: str,
+                     file_unique_id: str, notify_ids: list):
+        """Check a proof and warn notify_ids if it looks recycled"""
+        try:
+            hashes = await self._hash_video(bot, file_id)
+        except Exception as e:
+            metrics.increment("proof.errors")
+            print(f"❌ Could not verify proof from user {user_id}: {e}")
+            return
+
+        match = self._find_match(file_unique_id, hashes)
+        self._remember(user_id, file_unique_id, hashes)
+        metrics.increment("proof.checked")
+        if match is None:
+            return
+
+        metrics.increment("proof.flagged")
+        print(f"🕵️ Proof from user {user_id} matches proof {match['id']} from {match['date']}")
+        sent_on = datetime.fromisoformat(match["date"]).strftime("%b %d")
+        await self.fanout.send(
+            bot, notify_ids,
+            f"🕵️ SUSPICIOUS SWEATCAM!\n\n"
+            f"{name}'s latest video looks a lot like one sent on {sent_on}.\n"
+            f"Recycled footage? Ask for a fresh one! 👀"
+        )
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,85 @@
+"""
+Stats snapshot for Sweat Dupe bot
+The bot publishes a read-only copy of progress and history after every flush,
+and the web server serves it without touching the bot's live state
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+from config import STATS_SNAPSHOT_FILE
+
+
+def build_snapshot(data: dict) -> dict:
+    """Build the public stats view of the bot data"""
+    # Served publicly, so members are listed without their Telegram user_ids
+    members = []
+    for user in data.get("users", {}).values():
+        goal = user.get("weekly_goal", 0)
+        done = user.get("workouts_this_week", 0)
+        members.append({
+            "name": user.get("name"),
+            "weekly_goal": goal,
+            "workouts_this_week": done,
+            "goal_reached": goal > 0 and done >= goal,
+        })
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "progress": {
+            "week_start": data.get("week_start"),
+            "stakes": data.get("stakes"),
+            "members": members,
+        },
+        "history": [
+            {**week, "results": list(week.get("results", {}).values())}
+            for week in data.get("history", [])
+        ],
+    }
+
+
+def write_snapshot(data: dict, path: str = STATS_SNAPSHOT_FILE):
+    """Publish a snapshot atomically, so readers never see a half-written file"""
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(build_snapshot(data), f)
+    os.replace(temp_file, path)
+
+
+class SnapshotReader:
+    """Serves sections of the published snapshot, re-reading it only when it changes"""
+
+    def __init__(self, path: str = STATS_SNAPSHOT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file_key = None  # (inode, mtime_ns, size) of the loaded snapshot
+        self._sections = {}  # section: (body bytes, etag)
+
+    def get(self, section: str) -> Optional[tuple]:
+        """Get (JSON body, ETag) for a snapshot section, or None if nothing is published"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if file_key != self._file_key:
+                self._load(file_key)
+            return self._sections.get(section)
+
+    def _load(self, file_key: tuple):
+        """Read the snapshot and pre-render every section with its ETag"""
+        with open(self.path, 'r') as f:
+            snapshot = json.load(f)
+
+        sections = {}
+        for section in ("progress", "history"):
+            # Bodies leave out generated_at so unchanged stats keep their ETag
+            body = json.dumps({section: snapshot[section]}).encode()
+            sections[section] = (body, hashlib.sha1(body).hexdigest())
+
+        self._sections = sections
+        self._file_key = file_key
@@ -0,0 +1,78 @@
+"""
+Outbound HTTP setup for Sweat Dupe bot
+Tuned, instrumented connection pools for Telegram Bot API calls
+"""
+import importlib.util
+import time
+import httpx
+from telegram.request import HTTPXRequest
+import metrics
+from config import (
+    TELEGRAM_POOL_SIZE, TELEGRAM_UPDATES_POOL_SIZE, TELEGRAM_KEEPALIVE_SECONDS,
+    TELEGRAM_CONNECT_TIMEOUT, TELEGRAM_READ_TIMEOUT, TELEGRAM_WRITE_TIMEOUT,
+    TELEGRAM_POOL_TIMEOUT, TELEGRAM_HTTP_VERSION
+)
+
+
+class InstrumentedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest with a keep-alive setting that reports pool waits and connection reuse"""
+
+    def __init__(self, name: str, keepalive_seconds: float = TELEGRAM_KEEPALIVE_SECONDS, **kwargs):
+        # Set before super().__init__, which builds the client
+        self.name = name
+        self.keepalive_seconds = keepalive_seconds
+        super().__init__(**kwargs)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = self._client_kwargs["limits"]
+        self._client_kwargs["limits"] = httpx.Limits(
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_seconds,
+        )
+        self._client_kwargs["event_hooks"] = {"request": [self._trace_request]}
+        return super()._build_client()
+
+    async def _trace_request(self, request: httpx.Request):
+        """Attach an httpcore trace that times the wait for a connection"""
+        started = time.perf_counter()
+        state = {"new_connection": False, "done": False}
+
+        async def trace(event_name: str, info: dict):
+            if state["done"]:
+                return
+            if event_name == "connection.connect_tcp.started":
+                # Got a pool slot but had to open a new connection
+                state["new_connection"] = True
+                metrics.observe(f"http.{self.name}.pool_wait_ms", (time.perf_counter() - started) * 1000)
+                metrics.increment(f"http.{self.name}.connections_opened")
+            elif event_name.endswith("send_request_headers.started"):
+                if not state["new_connection"]:
+                    metrics.observe(f"http.{self.name}.pool_wait_ms", (time.perf_counter() - started) * 1000)
+                    metrics.increment(f"http.{self.name}.connections_reused")
+                state["done"] = True
+
+        request.extensions["trace"] = trace
+
+
+def build_requests() -> tuple:
+    """Get (request, get_updates_request) objects for Application.builder()"""
+    http_version = TELEGRAM_HTTP_VERSION
+    if http_version != "1.1" and importlib.util.find_spec("h2") is None:
+        print("⚠️  HTTP/2 needs python-telegram-bot[http2], falling back to HTTP/1.1")
+        http_version = "1.1"
+
+    timeouts = {
+        "connect_timeout": TELEGRAM_CONNECT_TIMEOUT,
+        "read_timeout": TELEGRAM_READ_TIMEOUT,
+        "write_timeout": TELEGRAM_WRITE_TIMEOUT,
+        "pool_timeout": TELEGRAM_POOL_TIMEOUT,
+    }
+    request = InstrumentedHTTPXRequest(
+        "outbound", connection_pool_size=TELEGRAM_POOL_SIZE, http_version=http_version, **timeouts
+    )
+    # get_updates long polls, so PTB passes its own (longer) read timeout per call
+    updates_request = InstrumentedHTTPXRequest(
+        "updates", connection_pool_size=TELEGRAM_UPDATES_POOL_SIZE, http_version=http_version, **timeouts
+    )
+    return request, updates_request
@@ -0,0 +1,16 @@
+"""
+Shared test setup for Sweat Dupe bot
+"""
+import os
+import sys
+import pytest
+
+# The bot's modules live at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Run every test in its own directory so data files never touch the real bot_data.json"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,83 @@
+"""
+Tests for redelivered update detection
+"""
+from datetime import datetime, timedelta
+from telegram import Chat, Message, Update
+from data_manager import DataManager
+from dedup import UpdateDeduplicator
+
+NOW = datetime(2026, 3, 2, 12, 0)
+
+
+def make_update(update_id: int, message_id: int, chat_id: int = 1, text: str = None) -> Update:
+    message = Message(message_id, NOW, Chat(chat_id, "private"), text=text)
+    return Update(update_id, message=message)
+
+
+def restart(data_manager: DataManager) -> UpdateDeduplicator:
+    """Save, then load everything again like a fresh process"""
+    data_manager.flush()
+    return UpdateDeduplicator(DataManager())
+
+
+def test_redelivered_update_is_duplicate():
+    dedup = UpdateDeduplicator(DataManager())
+    assert not dedup.is_duplicate(make_update(10, 1), now=NOW)
+    assert dedup.is_duplicate(make_update(10, 1), now=NOW)
+
+
+def test_same_message_under_new_update_id_is_duplicate():
+    dedup = UpdateDeduplicator(DataManager())
+    assert not dedup.is_duplicate(make_update(10, 1), now=NOW)
+    assert dedup.is_duplicate(make_update(11, 1), now=NOW)
+
+
+def test_mark_survives_restart():
+    data_manager = DataManager()
+    dedup = UpdateDeduplicator(data_manager)
+    dedup.is_duplicate(make_update(5000, 1), now=NOW)
+
+    dedup = restart(data_manager)
+    assert dedup.is_duplicate(make_update(5000, 1), now=NOW + timedelta(minutes=5))
+
+
+def test_lower_update_id_after_quiet_week_is_handled():
+    # Telegram picks a random update_id after a week without updates
+    data_manager = DataManager()
+    dedup = UpdateDeduplicator(data_manager)
+    dedup.is_duplicate(make_update(5000, 1), now=NOW)
+
+    dedup = restart(data_manager)
+    later = NOW + timedelta(days=8)
+    assert not dedup.is_duplicate(make_update(17, 2), now=later)
+    # The mark restarts from the new id
+    assert dedup.is_duplicate(make_update(17, 2), now=later)
+    assert not dedup.is_duplicate(make_update(18, 3), now=later)
+
+
+def test_mark_without_timestamp_is_ignored():
+    # Data files written before timestamps were stored
+    data_manager = DataManager()
+    data_manager.data["last_update_id"] = 5000
+    data_manager.flush()
+
+    dedup = UpdateDeduplicator(DataManager())
+    assert not dedup.is_duplicate(make_update(17, 1), now=NOW)
+
+
+def test_out_of_order_update_is_handled():
+    # Webhooks with several connections can deliver a lower id after a higher one
+    dedup = UpdateDeduplicator(DataManager())
+    assert not dedup.is_duplicate(make_update(10, 1, chat_id=1), now=NOW)
+    assert not dedup.is_duplicate(make_update(12, 1, chat_id=2), now=NOW)
+    assert not dedup.is_duplicate(make_update(11, 1, chat_id=3), now=NOW)
+
+
+def test_edited_message_is_not_a_duplicate():
+    dedup = UpdateDeduplicator(DataManager())
+    assert not dedup.is_duplicate(make_update(1, 5, text="/setgoal 3"), now=NOW)
+
+    edited = Message(5, NOW, Chat(1, "private"), text="/setgoal 4")
+    assert not dedup.is_duplicate(Update(2, edited_message=edited), now=NOW)
+    # A redelivery of the edit is still caught by its update_id
+    assert dedup.is_duplicate(Update(2, edited_message=edited), now=NOW)
@@ -0,0 +1,68 @@
+"""
+Tests for batched crew notifications
+"""
+import asyncio
+from types import SimpleNamespace
+import data_manager as data_manager_module
+import handlers
+from data_manager import DataManager
+from fanout import FanoutSender
+
+
+class FakeBot:
+    def __init__(self, failing=()):
+        self.sent = []
+        self.failing = set(failing)
+
+    async def send_message(self, chat_id, text):
+        if chat_id in self.failing:
+            raise RuntimeError("blocked by user")
+        self.sent.append((chat_id, text))
+
+
+def test_send_each_delivers_every_chat_despite_failures():
+    bot = FakeBot(failing={3})
+    texts = {chat_id: f"hi {chat_id}" for chat_id in range(1, 8)}
+    asyncio.run(FanoutSender(batch_size=3, interval=0).send_each(bot, texts))
+    assert sorted(bot.sent) == [(chat_id, f"hi {chat_id}") for chat_id in range(1, 8) if chat_id != 3]
+
+
+def test_batches_are_paced():
+    bot = FakeBot()
+    sender = FanoutSender(batch_size=2, interval=0.05)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await sender.send(bot, [1, 2, 3, 4, 5], "workout!")
+        return loop.time() - started
+
+    # 3 batches, 2 pauses between them
+    assert asyncio.run(run()) >= 0.1
+    assert len(bot.sent) == 5
+
+
+def test_group_new_week_notice_goes_through_fanout(monkeypatch):
+    monkeypatch.setattr(handlers, "GROUP_MODE", True)
+    monkeypatch.setattr(data_manager_module, "MAX_USERS", 50)
+    data_manager = DataManager()
+    for user_id in range(1, 6):
+        data_manager.add_user(user_id, f"Member {user_id}")
+    data_manager.data["needs_week_notification"] = True
+
+    bot = FakeBot()
+    bot_handlers = handlers.BotHandlers(data_manager, fanout=FanoutSender(batch_size=2, interval=0))
+
+    async def run():
+        tasks = []
+        context = SimpleNamespace(
+            bot=bot, application=SimpleNamespace(create_task=lambda c: tasks.append(asyncio.ensure_future(c)))
+        )
+        await bot_handlers._send_new_week_notification(context)
+        # Nothing is sent inline, it all goes through the background fan-out
+        assert bot.sent == [] and len(tasks) == 1
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2, 3, 4, 5]
+    assert not data_manager.should_send_week_notification()
@@ -0,0 +1,67 @@
+"""
+Tests for per-user flood control
+"""
+from datetime import datetime
+import pytest
+from telegram import Chat, Message, Update, User, VideoNote
+from flood_control import FloodController
+
+LIMITS = {"video_note": (0.5, 2), "other": (1.0, 3)}
+
+
+def test_burst_then_refill():
+    flood = FloodController(LIMITS)
+    # Bursts of 2, then empty
+    assert [flood.allow(1, "video_note", now=100.0) for _ in range(3)] == [True, True, False]
+    # 0.5 tokens/second: one more token after 2 seconds, not before
+    assert not flood.allow(1, "video_note", now=101.0)
+    assert flood.allow(1, "video_note", now=103.0)
+    assert not flood.allow(1, "video_note", now=103.0)
+
+
+def test_refill_is_capped_at_burst():
+    flood = FloodController(LIMITS)
+    flood.allow(1, "video_note", now=0.0)
+    assert [flood.allow(1, "video_note", now=1000.0) for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_per_user_and_class():
+    flood = FloodController(LIMITS)
+    flood.allow(1, "video_note", now=0.0)
+    flood.allow(1, "video_note", now=0.0)
+    assert not flood.allow(1, "video_note", now=0.0)
+    assert flood.allow(2, "video_note", now=0.0)
+    assert flood.allow(1, "other", now=0.0)
+
+
+def test_unknown_class_uses_other_limit():
+    flood = FloodController(LIMITS)
+    assert [flood.allow(1, "command", now=0.0) for _ in range(4)] == [True, True, True, False]
+
+
+def test_limits_without_other_are_rejected():
+    with pytest.raises(ValueError):
+        FloodController({"video_note": (1.0, 1)})
+
+
+def test_idle_buckets_are_evicted():
+    flood = FloodController(LIMITS, idle_seconds=60)
+    flood._last_sweep = 0.0
+    flood.allow(1, "other", now=0.0)
+    flood.allow(2, "other", now=50.0)
+    # The sweep at t=70 drops user 1 (idle 70s) but keeps user 2 (idle 20s)
+    flood.allow(3, "other", now=70.0)
+    assert set(flood._buckets) == {(2, "other"), (3, "other")}
+
+
+def make_update(**message_fields) -> Update:
+    user = User(1, "Sam", False)
+    message = Message(1, datetime.now(), Chat(1, "private"), from_user=user, **message_fields)
+    return Update(1, message=message)
+
+
+def test_classify():
+    assert FloodController.classify(make_update(video_note=VideoNote("f", "u", 240, 5))) == "video_note"
+    assert FloodController.classify(make_update(text="/progress")) == "command"
+    assert FloodController.classify(make_update(text="hello")) == "other"
+    assert FloodController.classify(Update(2)) == "other"
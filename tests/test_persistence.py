@@ -0,0 +1,47 @@
+"""
+Tests for the DataManager-backed PTB persistence
+"""
+import asyncio
+from data_manager import DataManager
+from persistence import DataManagerPersistence
+
+
+def run_update_cycle(*coroutines):
+    """Run update_* calls like Application.update_persistence, then let the flush run"""
+    async def cycle():
+        await asyncio.gather(*coroutines)
+        await asyncio.sleep(0)
+    asyncio.run(cycle())
+
+
+def test_ptb_and_bot_data_are_flushed_together():
+    data_manager = DataManager()
+    persistence = DataManagerPersistence(data_manager)
+    data_manager.set_stakes("loser buys dinner")
+    assert data_manager.is_dirty()
+
+    run_update_cycle(
+        persistence.update_bot_data({"count": 1}),
+        persistence.update_user_data(5, {"streak": 2}),
+        persistence.update_conversation("setup", (1, 5), "ASK_GOAL"),
+    )
+    assert not data_manager.is_dirty()
+
+    reloaded = DataManagerPersistence(DataManager())
+    assert reloaded.dm.get_stakes() == "loser buys dinner"
+    assert asyncio.run(reloaded.get_user_data()) == {5: {"streak": 2}}
+    assert asyncio.run(reloaded.get_conversations("setup")) == {(1, 5): "ASK_GOAL"}
+
+
+def test_non_json_ptb_data_does_not_block_saves():
+    data_manager = DataManager()
+    persistence = DataManagerPersistence(data_manager)
+    data_manager.set_stakes("loser does the dishes")
+
+    run_update_cycle(
+        persistence.update_bot_data({"count": 1}),
+        persistence.update_user_data(5, {"seen": {1, 2}}),
+    )
+    assert not data_manager.is_dirty()
+    assert DataManager().get_stakes() == "loser does the dishes"
+    assert "5" not in data_manager.data["ptb"]["user_data"]
@@ -0,0 +1,104 @@
+"""
+Tests for the cached crew progress board
+"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+import data_manager as data_manager_module
+import handlers
+from data_manager import DataManager
+from fanout import FanoutSender
+from progress_board import ProgressBoard
+
+
+class FakeMessage:
+    def __init__(self):
+        self.chat_id = 0
+        self.message_id = 0
+        self.replies = []
+
+    async def reply_text(self, text):
+        self.replies.append(text)
+
+
+class FakeBot:
+    async def send_message(self, chat_id, text):
+        pass
+
+    async def forward_message(self, chat_id, from_chat_id, message_id):
+        pass
+
+
+@pytest.fixture
+def crew(monkeypatch):
+    monkeypatch.setattr(handlers, "GROUP_MODE", True)
+    monkeypatch.setattr(handlers, "WHITELIST", [])
+    monkeypatch.setattr(handlers, "MAX_USERS", 50)
+    monkeypatch.setattr(data_manager_module, "MAX_USERS", 50)
+    data_manager = DataManager()
+    return data_manager, handlers.BotHandlers(data_manager, fanout=FanoutSender(interval=0))
+
+
+def call(handler, user_id, *args):
+    """Run a handler as user_id, with its background fan-outs finished before returning"""
+    async def run():
+        tasks = []
+        update = SimpleNamespace(
+            effective_user=SimpleNamespace(id=user_id, first_name=f"Member {user_id}", username=None),
+            message=FakeMessage(),
+        )
+        context = SimpleNamespace(
+            args=list(args), bot=FakeBot(),
+            application=SimpleNamespace(create_task=lambda c: tasks.append(asyncio.ensure_future(c))),
+        )
+        await handler(update, context)
+        await asyncio.gather(*tasks)
+    asyncio.run(run())
+
+
+def test_board_matches_a_fresh_render_after_every_change(crew):
+    data_manager, bot_handlers = crew
+    board = bot_handlers.board
+
+    def assert_fresh():
+        assert board.render() == ProgressBoard(data_manager).render()
+
+    steps = [
+        (bot_handlers.start, 1),
+        (bot_handlers.start, 2),
+        (bot_handlers.setgoal, 1, "3"),
+        (bot_handlers.setgoal, 2, "2"),
+        (bot_handlers.handle_video_note, 1),
+        (bot_handlers.handle_video_note, 2),
+        (bot_handlers.handle_video_note, 2),
+        (bot_handlers.start, 3),
+        (bot_handlers.setcrewgoal, 1, "4"),
+        (bot_handlers.setgoal, 1, "1"),
+        (bot_handlers.setstakes, 2, "loser", "buys", "smoothies"),
+        (bot_handlers.handle_video_note, 1),
+        (bot_handlers.test_reset, 1, "force"),
+        (bot_handlers.setgoal, 3, "5"),
+        (bot_handlers.handle_video_note, 3),
+    ]
+    assert_fresh()
+    for handler, user_id, *args in steps:
+        call(handler, user_id, *args)
+        assert_fresh()
+
+    text = board.render()
+    assert "👥 CREW: 1/4 workouts" in text
+    assert "⏳ Member 3: 1/5" in text
+    assert "💰 Stakes: loser buys smoothies" in text
+
+
+def test_record_workout_patches_the_cached_board(crew):
+    data_manager, bot_handlers = crew
+    call(bot_handlers.start, 1)
+    call(bot_handlers.setgoal, 1, "1")
+    board = bot_handlers.board
+    board.render()
+
+    call(bot_handlers.handle_video_note, 1)
+    # Patched in place rather than rebuilt from scratch
+    assert board._lines is not None
+    assert "✅ Member 1: 1/1" in board.render()
@@ -0,0 +1,99 @@
+"""
+End-to-end test of proof verification: download through the Bot API file
+endpoint of a local stand-in server, hash in the spawn pool, warn the partner
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote
+import pytest
+from telegram import Bot
+from data_manager import DataManager
+from fanout import FanoutSender
+from proof_verifier import ProofVerifier
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+TOKEN = "123:proof-test"
+
+
+def make_video(path: str):
+    """A short clip of a dot moving across the frame"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 64))
+    for i in range(40):
+        frame = np.zeros((64, 64, 3), np.uint8)
+        cv2.circle(frame, (10 + i, 32), 8, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+class FakeTelegram(BaseHTTPRequestHandler):
+    """Bot API + file download stand-in serving one video for every file_id"""
+
+    video = b""
+    sent = []
+
+    def _reply(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # PTB percent-encodes the file URL, including the token's colon
+        if unquote(self.path) == f"/file/bot{TOKEN}/videos/proof.mp4":
+            self._reply(self.video, "video/mp4")
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        fields = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        method = self.path.rsplit("/", 1)[-1]
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Sweat Dupe", "username": "sweatdupe_bot"}
+        elif method == "getFile":
+            result = {"file_id": fields["file_id"][0], "file_unique_id": "x", "file_path": "videos/proof.mp4"}
+        else:
+            self.sent.append((int(fields["chat_id"][0]), fields["text"][0]))
+            result = {"message_id": 1, "date": int(time.time()), "chat": {"id": 1, "type": "private"}}
+        self._reply(json.dumps({"ok": True, "result": result}).encode(), "application/json")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_telegram(tmp_path):
+    make_video(str(tmp_path / "clip.mp4"))
+    FakeTelegram.video = (tmp_path / "clip.mp4").read_bytes()
+    FakeTelegram.sent = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_resent_clip_warns_partner(fake_telegram):
+    verifier = ProofVerifier(DataManager(), FanoutSender(interval=0))
+    bot = Bot(TOKEN, base_url=f"{fake_telegram}/bot", base_file_url=f"{fake_telegram}/file/bot")
+
+    async def run():
+        async with bot:
+            await verifier.verify(bot, 1, "Sam", "file-a", "unique-a", [2])
+            assert FakeTelegram.sent == []
+            # Same footage under a new file_unique_id, so only the frame hashes can catch it
+            await verifier.verify(bot, 1, "Sam", "file-b", "unique-b", [2])
+
+    try:
+        asyncio.run(run())
+    finally:
+        verifier.shutdown()
+
+    assert len(verifier._proofs()) == 2 and verifier._proofs()[0]["hashes"]
+    assert len(FakeTelegram.sent) == 1
+    chat_id, text = FakeTelegram.sent[0]
+    assert chat_id == 2 and "SUSPICIOUS SWEATCAM" in text
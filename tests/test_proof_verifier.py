@@ -0,0 +1,68 @@
+"""
+Tests for recycled proof detection, using synthetic frame hashes
+"""
+import random
+import proof_verifier
+from data_manager import DataManager
+from proof_verifier import HashIndex, ProofVerifier
+
+
+def flip_bits(value: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def test_hash_index_matches_brute_force():
+    rng = random.Random(13)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    index = HashIndex()
+    for proof_id, value in enumerate(values):
+        index.add(value, proof_id)
+
+    for query in (flip_bits(values[7], 3, rng), rng.getrandbits(64)):
+        expected = {i for i, value in enumerate(values) if (value ^ query).bit_count() <= 10}
+        assert index.search(query, 10) == expected
+
+
+def test_similar_frames_are_flagged():
+    rng = random.Random(5)
+    verifier = ProofVerifier(DataManager())
+    original = [rng.getrandbits(64) for _ in range(8)]
+    verifier._remember(1, "first", original)
+
+    # Re-recorded clip: every frame a few bits off
+    rerecorded = [flip_bits(value, 3, rng) for value in original]
+    match = verifier._find_match("second", rerecorded)
+    assert match is not None and match["file_unique_id"] == "first"
+
+
+def test_too_few_matching_frames_are_not_flagged():
+    rng = random.Random(6)
+    verifier = ProofVerifier(DataManager())
+    original = [rng.getrandbits(64) for _ in range(8)]
+    verifier._remember(1, "first", original)
+
+    # Only 3 of 8 frames match, below PROOF_MATCH_MIN_FRAMES
+    fresh = original[:3] + [rng.getrandbits(64) for _ in range(5)]
+    assert verifier._find_match("second", fresh) is None
+
+
+def test_resent_file_is_flagged_without_hashes():
+    verifier = ProofVerifier(DataManager())
+    verifier._remember(1, "same-file", [1, 2, 3])
+    assert verifier._find_match("same-file", [])["file_unique_id"] == "same-file"
+
+
+def test_history_is_trimmed_in_chunks(monkeypatch):
+    monkeypatch.setattr(proof_verifier, "PROOF_HISTORY_LIMIT", 10)
+    rng = random.Random(7)
+    verifier = ProofVerifier(DataManager())
+    clips = [[rng.getrandbits(64) for _ in range(8)] for _ in range(11)]
+    for i, clip in enumerate(clips):
+        verifier._remember(1, f"proof-{i}", clip)
+    assert [proof["file_unique_id"] for proof in verifier._proofs()] == [f"proof-{i}" for i in range(2, 11)]
+
+    # Trimmed proofs are gone from the index too
+    assert verifier._find_match("new", clips[0]) is None
+    assert verifier._find_match("new", clips[5])["file_unique_id"] == "proof-5"
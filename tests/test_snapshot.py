@@ -0,0 +1,55 @@
+"""
+Tests for the published stats snapshot
+"""
+import json
+from data_manager import DataManager
+from snapshot import build_snapshot, SnapshotReader, write_snapshot
+
+DATA = {
+    "users": {
+        "650908312": {"name": "Geoffrey", "weekly_goal": 3, "workouts_this_week": 3},
+        "123456789": {"name": "Sam", "weekly_goal": 4, "workouts_this_week": 1},
+    },
+    "stakes": "loser buys dinner",
+    "week_start": "2026-03-02T00:00:00",
+    "history": [{
+        "week_start": "2026-02-23T00:00:00",
+        "stakes": "loser buys dinner",
+        "results": {"650908312": {"name": "Geoffrey", "weekly_goal": 3, "workouts": 2}},
+    }],
+}
+
+
+def test_snapshot_does_not_publish_user_ids():
+    published = json.dumps(build_snapshot(DATA))
+    assert "650908312" not in published
+    assert "123456789" not in published
+    assert "Geoffrey" in published
+
+
+def test_reader_etag_only_changes_with_stats():
+    write_snapshot(DATA)
+    reader = SnapshotReader()
+    body, etag = reader.get("progress")
+    assert json.loads(body)["progress"]["stakes"] == "loser buys dinner"
+
+    write_snapshot(DATA)
+    assert reader.get("progress")[1] == etag
+
+    write_snapshot({**DATA, "stakes": "loser does the dishes"})
+    assert reader.get("progress")[1] != etag
+
+
+def test_only_real_rollovers_are_recorded_in_history():
+    data_manager = DataManager()
+    data_manager.add_user(1, "Geoffrey")
+    data_manager.data["week_start"] = "2026-02-23T00:00:00"
+
+    # /test_reset force
+    data_manager._reset_weekly_data()
+    assert data_manager.data.get("history", []) == []
+
+    # A real rollover, from a week in the past
+    data_manager.data["week_start"] = "2026-02-23T00:00:00"
+    assert data_manager.check_and_reset_week()
+    assert [week["week_start"] for week in data_manager.data["history"]] == ["2026-02-23T00:00:00"]
@@ -0,0 +1,70 @@
+"""
+Tests for the tuned, instrumented Telegram connection pools
+"""
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer
+import pytest
+import metrics
+from config import TELEGRAM_POOL_SIZE, TELEGRAM_UPDATES_POOL_SIZE
+from load_test import FakeBotAPIHandler
+from telegram_request import build_requests
+
+LATENCY = 0.1
+
+
+@pytest.fixture
+def fake_api_url():
+    FakeBotAPIHandler.latency = LATENCY
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBotAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/bot123:test"
+    server.shutdown()
+
+
+def timed_concurrent_calls(request, url: str, calls: int) -> float:
+    """Make calls concurrently through one request object, returning the elapsed seconds"""
+    async def run():
+        await request.initialize()
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(request.post(f"{url}/sendMessage", None) for _ in range(calls)))
+            # Second round reuses the kept-alive connections
+            await asyncio.gather(*(request.post(f"{url}/sendMessage", None) for _ in range(calls)))
+            return time.perf_counter() - started
+        finally:
+            await request.shutdown()
+    return asyncio.run(run())
+
+
+def counter(name: str) -> int:
+    return metrics.snapshot()["counters"].get(name, 0)
+
+
+def test_pools_are_tuned_and_separate():
+    request, updates_request = build_requests()
+    assert TELEGRAM_POOL_SIZE > TELEGRAM_UPDATES_POOL_SIZE
+    assert request.name == "outbound" and updates_request.name == "updates"
+    # Our keep-alive setting survives into the client PTB builds
+    assert request._client_kwargs["limits"].keepalive_expiry == request.keepalive_seconds
+    assert request._client_kwargs["limits"].max_connections == TELEGRAM_POOL_SIZE
+    assert updates_request._client_kwargs["limits"].max_connections == TELEGRAM_UPDATES_POOL_SIZE
+
+
+def test_outbound_calls_reuse_connections_and_report_pool_waits(fake_api_url):
+    request, updates_request = build_requests()
+    reused_before = counter("http.outbound.connections_reused")
+    opened_before = counter("http.outbound.connections_opened")
+
+    calls = 4
+    outbound_elapsed = timed_concurrent_calls(request, fake_api_url, calls)
+    updates_elapsed = timed_concurrent_calls(updates_request, fake_api_url, calls)
+
+    assert counter("http.outbound.connections_opened") - opened_before == calls
+    assert counter("http.outbound.connections_reused") - reused_before >= calls
+    observations = metrics.snapshot()["observations"]
+    assert observations["http.outbound.pool_wait_ms"]["count"] >= 2 * calls
+    # With one connection, the updates pool makes calls wait their turn
+    assert observations["http.updates.pool_wait_ms"]["max"] >= LATENCY * 1000
+    assert outbound_elapsed < 2 * calls * LATENCY <= updates_elapsed
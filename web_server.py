@@ -3,10 +3,18 @@ Web server wrapper for Render.com free tier deployment
 Keeps the bot alive by exposing a health check endpoint
 """
 import asyncio
-from flask import Flask
+import signal
+import sys
+from flask import Flask, Response, jsonify, request
 from threading import Thread
+from snapshot import SnapshotReader
 
 app = Flask(__name__)
+stats_snapshot = SnapshotReader()
+
+# Set by run_bot so the main thread can shut the bot down cleanly
+bot_runtime = {}
+BOT_SHUTDOWN_TIMEOUT = 20  # Seconds to wait for the bot to stop and flush
 
 @app.route('/')
 def home():
@@ -16,6 +24,30 @@ def home():
 def health():
     return "OK", 200
 
+@app.route('/metrics')
+def metrics_view():
+    import metrics
+    return jsonify(metrics.snapshot())
+
+def _snapshot_response(section):
+    """Serve a section of the bot's published stats snapshot with ETag caching"""
+    cached = stats_snapshot.get(section)
+    if cached is None:
+        return jsonify({"error": "Stats not published yet"}), 503
+    body, etag = cached
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+@app.route('/api/progress')
+def api_progress():
+    return _snapshot_response("progress")
+
+@app.route('/api/history')
+def api_history():
+    return _snapshot_response("history")
+
 def run_bot():
     """Run the Telegram bot in a separate thread"""
     # Create new event loop for this thread
@@ -24,27 +56,68 @@ def run_bot():
     
     try:
         # Import here to avoid issues
-        from telegram.ext import Application, CommandHandler, MessageHandler, filters
+        from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters
         from telegram import Update
-        from config import TELEGRAM_BOT_TOKEN
+        from config import (
+            TELEGRAM_BOT_TOKEN, TELEGRAM_BASE_URL, TELEGRAM_BASE_FILE_URL,
+            FLOOD_CONTROL_ENABLED, PROOF_VERIFICATION_ENABLED
+        )
         from data_manager import DataManager
         from handlers import BotHandlers
+        from flood_control import FloodController
+        from dedup import UpdateDeduplicator
+        from persistence import DataManagerPersistence
+        from proof_verifier import ProofVerifier
+        from fanout import FanoutSender
+        from telegram_request import build_requests
         
         # Create bot components
         data_manager = DataManager()
-        handlers = BotHandlers(data_manager)
+        bot_runtime["data_manager"] = data_manager
+        fanout = FanoutSender()  # Shared, so all crew messages are paced together
+        proof_verifier = None
+        if PROOF_VERIFICATION_ENABLED:
+            if ProofVerifier.is_available():
+                proof_verifier = ProofVerifier(data_manager, fanout)
+            else:
+                print("⚠️  Proof verification needs opencv-python-headless, skipping it")
+        handlers = BotHandlers(data_manager, proof_verifier, fanout)
+        flood_controller = FloodController()
+        deduplicator = UpdateDeduplicator(data_manager)
         
         if not TELEGRAM_BOT_TOKEN or TELEGRAM_BOT_TOKEN == "your_token_here":
             print("⚠️  Please add your bot token to the environment variables!")
             return
         
-        # Build application
-        application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+        async def post_shutdown(application):
+            """Stop background workers once the bot has stopped"""
+            if proof_verifier:
+                proof_verifier.shutdown()
+        
+        # Build application (PTB data is stored alongside ours, one flush per interval)
+        request, updates_request = build_requests()
+        application = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .request(request)
+            .get_updates_request(updates_request)
+            .base_url(TELEGRAM_BASE_URL)
+            .base_file_url(TELEGRAM_BASE_FILE_URL)
+            .persistence(DataManagerPersistence(data_manager))
+            .post_shutdown(post_shutdown)
+            .build()
+        )
+        
+        # Drop redelivered updates, then floods, before any handler runs
+        application.add_handler(TypeHandler(Update, deduplicator.check_update), group=-2)
+        if FLOOD_CONTROL_ENABLED:
+            application.add_handler(TypeHandler(Update, flood_controller.check_update), group=-1)
         
         # Add handlers
         application.add_handler(CommandHandler("myid", handlers.myid))
         application.add_handler(CommandHandler("start", handlers.start))
         application.add_handler(CommandHandler("setgoal", handlers.setgoal))
+        application.add_handler(CommandHandler("setcrewgoal", handlers.setcrewgoal))
         application.add_handler(CommandHandler("setstakes", handlers.setstakes))
         application.add_handler(CommandHandler("progress", handlers.progress))
         application.add_handler(CommandHandler("test_reset", handlers.test_reset))
@@ -53,8 +126,12 @@ def run_bot():
         
         print("🤖 Sweat Dupe Bot is running...")
         
-        # Run the bot with asyncio
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        bot_runtime["application"] = application
+        bot_runtime["loop"] = loop
+        
+        # Run the bot with asyncio. Signal handlers can only be installed from the
+        # main thread, so stop_bot() there stops the bot instead
+        application.run_polling(allowed_updates=Update.ALL_TYPES, stop_signals=None)
         
     except ValueError as e:
         print(f"⚠️  Configuration Error: {e}")
@@ -65,7 +142,26 @@ def run_bot():
         import traceback
         traceback.print_exc()
 
+def stop_bot(signum, frame):
+    """Stop the bot on its own loop so batched data gets flushed, then exit"""
+    print("\n👋 Shutting down, saving bot data...")
+    application = bot_runtime.get("application")
+    loop = bot_runtime.get("loop")
+    if application is not None and loop is not None and loop.is_running():
+        loop.call_soon_threadsafe(application.stop_running)
+        bot_thread.join(timeout=BOT_SHUTDOWN_TIMEOUT)
+    
+    # Fallback if the bot never started or didn't stop in time
+    data_manager = bot_runtime.get("data_manager")
+    if data_manager is not None and data_manager.is_dirty():
+        data_manager.flush()
+    sys.exit(0)
+
 if __name__ == "__main__":
+    # Render sends SIGTERM on every redeploy / restart
+    signal.signal(signal.SIGTERM, stop_bot)
+    signal.signal(signal.SIGINT, stop_bot)
+    
     # Start bot in background thread
     bot_thread = Thread(target=run_bot, daemon=True)
     bot_thread.start()